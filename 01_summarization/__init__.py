@@ -1 +1 @@
-from .summarizer import MeetingSummarizer
+from .summarizer import MeetingSummarizer, Turn
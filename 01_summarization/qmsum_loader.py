@@ -1,5 +1,13 @@
-import os, json, re, glob
-from typing import Iterable, Tuple
+import os, json, glob
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+try:  # imported as the 01_summarization package
+    from .text_cleaning import clean_text
+except ImportError:  # 01_summarization/ on sys.path (app/, eval/ runners)
+    from text_cleaning import clean_text
+
 
 def _concat_transcript(js) -> str:
     mt = js.get("meeting_transcripts", [])
@@ -7,9 +15,7 @@ def _concat_transcript(js) -> str:
     for i, seg in enumerate(mt):
         spk = seg.get("speaker") or "UNK"
         txt = seg.get("content") or ""
-        txt = re.sub(r'[\u2600-\u26FF\u2700-\u27BF]+', '', txt)  # strip emoji
-        txt = re.sub(r'\b(uh+|um+)\b', '', txt, flags=re.IGNORECASE)
-        txt = txt.strip()
+        txt = clean_text(txt)
         if txt:
             parts.append(f"{spk} [{i}]: {txt}")
     return "\n".join(parts)
@@ -44,23 +50,51 @@ def _extract_queries(js) -> Iterable[Tuple[str, str, str]]:
             ref = ref["text"]
         yield ("single", js["query"].strip(), str(ref).strip())
 
-def iter_qmsum(split_dir: str):
+def _load_json(fp: str) -> Dict:
+    # Read whole: stdlib json can only parse str/bytes, so mmap-ing the file
+    # would just add a copy. The memory win needs a parser that reads buffers.
+    with open(fp, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _prefetch_json(files: List[str], prefetch: int) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yields (path, parsed JSON) in file order while up to `prefetch` files are
+    read in background threads, so disk reads overlap with downstream work.
+    """
+    if prefetch <= 1:
+        for fp in files:
+            yield fp, _load_json(fp)
+        return
+    with ThreadPoolExecutor(max_workers=prefetch) as pool:
+        it = iter(files)
+        pending = deque()
+        for fp in it:
+            pending.append((fp, pool.submit(_load_json, fp)))
+            if len(pending) >= prefetch:
+                break
+        while pending:
+            fp, fut = pending.popleft()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(_load_json, nxt)))
+            yield fp, fut.result()
+
+def iter_qmsum(split_dir: str, prefetch: int = 8):
     """
     Iterates over ALL files in the split (train/val/test) and all queries in each file.
-    Yields dict with: meeting_id, query_id, query, input_text, reference
+    Yields dict with: meeting_id, query_id, query, transcript, reference
+    `transcript` is built once per file and shared by all of that meeting's queries.
+    Up to `prefetch` files are read ahead in background threads.
     """
     files = sorted(glob.glob(os.path.join(split_dir, "*.json")))
-    for fp in files:
-        with open(fp, "r", encoding="utf-8") as f:
-            js = json.load(f)
+    for fp, js in _prefetch_json(files, prefetch):
         meeting_id = js.get("meeting_id") or os.path.splitext(os.path.basename(fp))[0]
         transcript = _concat_transcript(js)
         for qid, query, ref in _extract_queries(js):
-            input_text = f"Summarize the meeting in response to this query: '{query}' Write 2–4 sentences, around 60–80 words.\n\n{transcript}"
             yield {
                 "meeting_id": meeting_id,
                 "query_id": qid,
                 "query": query,
-                "input_text": input_text,
+                "transcript": transcript,
                 "reference": ref,
             }
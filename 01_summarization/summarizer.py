@@ -1,13 +1,38 @@
 import json
-import re
 import os
 import time
 import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from openai import OpenAI, RateLimitError
 from dotenv import load_dotenv
 
+try:  # imported as the 01_summarization package
+    from .text_cleaning import clean_text
+except ImportError:  # 01_summarization/ on sys.path (app/, eval/ runners)
+    from text_cleaning import clean_text
+
+
+@dataclass(slots=True, frozen=True)
+class Turn:
+    """One preprocessed transcript utterance."""
+    speaker: str
+    timestamp: Optional[str]
+    text: str
+
+
+_CLIENT: Optional[OpenAI] = None
+
+def _client() -> OpenAI:
+    """Process-wide OpenAI client, so every summarizer reuses one HTTP connection pool."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = OpenAI()
+    return _CLIENT
+
 
 class MeetingSummarizer:
     """
@@ -15,52 +40,66 @@ class MeetingSummarizer:
       - preprocessing helpers
       - prompt builder (general / decision / blocker / query)
       - OpenAI chat completion with optional system prompt + low temperature
-      - simple cache to avoid repeated API calls
+      - simple cache to avoid repeated API calls (append-only disk log, fronted by an in-process memo)
       - optional revise() pass to polish final output (for better ROUGE-2/L)
     """
-    def __init__(self, cache_dir: str = "cache"):
+    def __init__(self, cache_dir: str = "cache", mem_cache_size: int = 1024):
         load_dotenv()
-        self.client = OpenAI()
+        self.client = _client()
         self.cache_dir = cache_dir
+        self.mem_cache_size = mem_cache_size
+        self._mem_cache: "OrderedDict[str, str]" = OrderedDict()  # cache key -> response (LRU), skips disk on repeats
         os.makedirs(self.cache_dir, exist_ok=True)
         os.makedirs("output", exist_ok=True)
         os.makedirs("logs", exist_ok=True)
 
+        # One append-only log per cache dir ("<key> <json response>\n" records) instead of a file per prompt
+        self._cache_lock = threading.Lock()
+        self._cache_log_path = os.path.join(self.cache_dir, "cache.log")
+        self._cache_index = self._load_cache_index()
+        self._cache_log = open(self._cache_log_path, "a+b")
+
+    def close(self) -> None:
+        """Close the cache log handle. Safe to call more than once."""
+        with self._cache_lock:
+            self._cache_log.close()
+
+    def __enter__(self) -> "MeetingSummarizer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
     # ----------------------------
     # Data loading / preprocessing
     # ----------------------------
-    def load_and_preprocess_transcript(self, file_path: str) -> List[Dict]:
+    def load_and_preprocess_transcript(self, file_path: str) -> List[Turn]:
         """
         Expects a JSON transcript: list of dicts with keys like {user/speaker, timestamp, text}.
-        Cleans emoji and filler words ('uh', 'um').
+        Cleans emoji and filler words ('uh', 'um') and returns one Turn per entry.
         """
         with open(file_path, 'r', encoding='utf-8') as f:
             raw_data = json.load(f)
 
         processed = []
+        speakers: Dict[str, str] = {}  # a handful of names repeat across thousands of turns: keep one copy each
         for entry in raw_data:
             text = entry.get("text", "") or ""
-            # strip emoji symbols
-            text = re.sub(r'[\u2600-\u26FF\u2700-\u27BF]+', '', text)
-            # strip simple fillers
-            text = re.sub(r'\b(uh+|um+)\b', '', text, flags=re.IGNORECASE)
-            text = text.strip()
-
-            processed.append({
-                "speaker": entry.get("user") or entry.get("speaker") or "UNK",
-                "timestamp": entry.get("timestamp"),
-                "text": text
-            })
+            text = clean_text(text)
+            speaker = entry.get("user") or entry.get("speaker") or "UNK"
+
+            processed.append(Turn(
+                speaker=speakers.setdefault(speaker, speaker),
+                timestamp=entry.get("timestamp"),
+                text=text,
+            ))
         return processed
 
     # ----------------------------
     # Prompt building
     # ----------------------------
-    def build_prompt(self, transcript: List[Dict], mode: str = "general", query: Optional[str] = None) -> str:
-        dialogue = "\n".join(
-            f"{msg.get('speaker','UNK')} [{msg.get('timestamp','')}]: {msg.get('text','')}"
-            for msg in transcript
-        )
+    def build_prompt(self, transcript: List[Turn], mode: str = "general", query: Optional[str] = None) -> str:
+        dialogue = "\n".join(f"{t.speaker} [{t.timestamp}]: {t.text}" for t in transcript)
 
         length_hint = "Write 2–4 sentences, around 60–80 words.\n"
         if mode == "decision":
@@ -77,12 +116,72 @@ class MeetingSummarizer:
     # ----------------------------
     # Caching helpers
     # ----------------------------
-    def get_cache_path(self, prompt: str, model: str = "gpt-3.5-turbo", system_prompt: str = "", temperature: float = 0.0) -> str:
+    def get_cache_key(self, prompt: str, model: str = "gpt-3.5-turbo", system_prompt: str = "", temperature: float = 0.0,
+                      max_tokens: int = 150) -> str:
+        """
+        Include system_prompt, temperature and max_tokens in the key so different behaviors don't collide in cache
+        (an answer truncated at a lower max_tokens must not be served to a call with a larger budget).
+        The prompt is whitespace-normalized so formatting-only edits still hit the cache.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        # parts are fed separately (no concatenated copy of the prompt) with a NUL between
+        # them, so e.g. model + system_prompt boundaries can't shift and collide
+        for part in (model, system_prompt or "", f"t={temperature}", f"max_tokens={max_tokens}", " ".join(prompt.split())):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()
+
+    def _load_cache_index(self) -> Dict[str, Tuple[int, int]]:
         """
-        Include system_prompt and temperature in the key so different behaviors don't collide in cache.
+        Scan the cache log once: key -> (offset, length) of its record.
+        A truncated last record (interrupted write) is cut so later appends stay line-aligned.
         """
-        key = hashlib.md5((model + (system_prompt or "") + f"t={temperature}" + prompt).encode("utf-8")).hexdigest()
-        return os.path.join(self.cache_dir, f"{key}.json")
+        index: Dict[str, Tuple[int, int]] = {}
+        if not os.path.exists(self._cache_log_path):
+            return index
+        offset = 0
+        with open(self._cache_log_path, "rb+") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    f.truncate(offset)
+                    break
+                key, _, _ = line.partition(b" ")
+                index[key.decode("ascii")] = (offset, len(line))
+                offset += len(line)
+        return index
+
+    def _memo_get(self, key: str) -> Optional[str]:
+        with self._cache_lock:
+            value = self._mem_cache.get(key)
+            if value is not None:
+                self._mem_cache.move_to_end(key)
+            return value
+
+    def _memo_put(self, key: str, value: str) -> None:
+        with self._cache_lock:
+            self._mem_cache[key] = value
+            self._mem_cache.move_to_end(key)
+            if len(self._mem_cache) > self.mem_cache_size:
+                self._mem_cache.popitem(last=False)
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        loc = self._cache_index.get(key)
+        if loc is None:
+            return None
+        offset, length = loc
+        with self._cache_lock:
+            self._cache_log.seek(offset)
+            record = self._cache_log.read(length)
+        return json.loads(record.partition(b" ")[2])
+
+    def _cache_put(self, key: str, response: str) -> None:
+        record = key.encode("ascii") + b" " + json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+        with self._cache_lock:
+            self._cache_log.seek(0, os.SEEK_END)
+            offset = self._cache_log.tell()
+            self._cache_log.write(record)
+            self._cache_log.flush()
+            self._cache_index[key] = (offset, len(record))
 
     # ----------------------------
     # Core model call
@@ -102,10 +201,15 @@ class MeetingSummarizer:
           - modest max_tokens to reduce drift and cost
         Backward compatible: if system_prompt is None, behavior matches older calls.
         """
-        cache_path = self.get_cache_path(prompt, model=model, system_prompt=(system_prompt or ""), temperature=temperature)
-        if os.path.exists(cache_path):
-            with open(cache_path, "r", encoding="utf-8") as f:
-                return json.load(f)["response"]
+        cache_key = self.get_cache_key(prompt, model=model, system_prompt=(system_prompt or ""), temperature=temperature,
+                                       max_tokens=max_tokens)
+        cached = self._memo_get(cache_key)
+        if cached is None:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self._memo_put(cache_key, cached)
+        if cached is not None:
+            return cached
 
         messages = []
         if system_prompt:
@@ -130,13 +234,8 @@ class MeetingSummarizer:
                 wait = min(wait * 2, 60)
         output = response.choices[0].message.content
 
-        with open(cache_path, "w", encoding="utf-8") as f:
-            json.dump(
-                {"prompt": prompt, "system_prompt": system_prompt, "response": output},
-                f,
-                ensure_ascii=False,
-                indent=2,
-            )
+        self._cache_put(cache_key, output)
+        self._memo_put(cache_key, output)
 
         return output
 
@@ -173,14 +272,16 @@ class MeetingSummarizer:
         """
         Backward-compatible parser for the single-transcript flow used by main.py.
         """
-        sections = raw_llm_response.strip().split("Action Items:")
-        summary = sections[0].strip()
-        action_items = (
-            [line.strip("- ").strip() for line in sections[1].split("\n") if line.strip()]
-            if len(sections) > 1 else []
-        )
+        head, sep, tail = raw_llm_response.strip().partition("Action Items:")
+        action_items = []
+        if sep:
+            for line in tail.splitlines():
+                line = line.strip()
+                if line:
+                    # drop only the bullet marker; strip("- ") would also eat e.g. "-1 day" or "--flag"
+                    action_items.append(line[2:].strip() if line.startswith("- ") else line)
         return {
-            "summary": summary,
+            "summary": head.strip(),
             "action_items": action_items,
             "decisions": [],
             "blockers": []
@@ -191,12 +292,13 @@ class MeetingSummarizer:
             json.dump(summary_dict, f, ensure_ascii=False, indent=2)
 
     def log_experiment(self, inputs: Dict, outputs: Dict, metadata: Dict) -> None:
+        now = datetime.now()  # one clock read so the timestamp and filename agree
         log = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "inputs": inputs,
             "outputs": outputs,
             "metadata": metadata
         }
-        filename = f"logs/log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        filename = f"logs/log_{now.strftime('%Y%m%d_%H%M%S_%f')}.json"  # microseconds keep rapid runs apart
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(log, f, ensure_ascii=False, indent=2)
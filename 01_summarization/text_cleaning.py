@@ -0,0 +1,16 @@
+import re
+
+# emoji -> deleted by str.translate: Misc Symbols + Dingbats, the supplementary
+# emoji blocks (pictographs, emoticons, transport, symbols & pictographs ext.),
+# plus the ZWJ / VS16 joiners that would otherwise be left behind by sequences
+_EMOJI_TABLE = dict.fromkeys([*range(0x2600, 0x27C0), *range(0x1F300, 0x1FB00), 0x200D, 0xFE0F])
+_FILLER_RE = re.compile(r'\b(?:uh+|um+)\b', re.IGNORECASE)
+
+def clean_text(txt: str) -> str:
+    """Strip emoji and simple fillers ('uh', 'um')."""
+    if not txt.isascii():  # O(1) flag check; most transcript segments carry no emoji
+        txt = txt.translate(_EMOJI_TABLE)
+    low = txt.lower()
+    if "uh" in low or "um" in low:
+        txt = _FILLER_RE.sub('', txt)
+    return txt.strip()
@@ -14,49 +14,115 @@ def classify_speaker_role(speaker):
     else:
         return "unknown"
 
+# Keyword tables. Where a detector returns a single label, the first matching entry wins.
+# Matched as whole words/phrases:
+_UTTERANCE_TYPE_KEYWORDS = [
+    ("question", ["what", "can", "do", "should", "could", "will"]),
+    ("instruction", ["please", "start", "make sure", "prepare"]),
+    ("status report", ["fixed", "done", "completed", "progress", "working on"]),
+    ("commitment", ["yes", "i will", "i’ll", "sure", "okay"]),
+    ("greeting", ["hello", "hi", "welcome"]),
+]
+_EMOTION_KEYWORDS = [
+    ("positive", ["great", "awesome", "amazing", "nice"]),
+    ("negative", ["sorry", "problem", "issue", "blocked"]),
+]
+# Matched anywhere in the text:
+_TOPIC_KEYWORDS = [
+    ("bug fix update", ["login", "bug"]),
+    ("testing schedule", ["qa", "testing"]),
+    ("release preparation", ["release notes"]),
+    ("meeting kickoff", ["welcome"]),
+]
+_DECISION_KEYWORDS = ["yes", "i will", "we decided", "it’s fixed", "let’s go ahead"]
+_BLOCKER_KEYWORDS = ["blocked", "can’t", "issue", "problem", "delay"]
+_NEXT_ACTION_KEYWORDS = ["please", "need to", "make sure", "start", "schedule", "ask", "prepare"]
+
+_LABEL_BITS = {}  # (field, label) -> its own bit in the per-utterance flag word
+
+def _keyword_flags(field_tables):
+    """keyword -> OR of the label bits it signals."""
+    flags = {}
+    for field, table in field_tables:
+        for label, keywords in table:
+            bit = _LABEL_BITS.setdefault((field, label), 1 << len(_LABEL_BITS))
+            for kw in keywords:
+                flags[kw] = flags.get(kw, 0) | bit
+    return flags
+
+_WORD_FLAGS = _keyword_flags([
+    ("utterance_type", _UTTERANCE_TYPE_KEYWORDS),
+    ("emotion", _EMOTION_KEYWORDS),
+])
+_SUBSTRING_FLAGS = _keyword_flags([
+    ("topic", _TOPIC_KEYWORDS),
+    ("decision", [(True, _DECISION_KEYWORDS)]),
+    ("blocker", [(True, _BLOCKER_KEYWORDS)]),
+    ("next_action", [(True, _NEXT_ACTION_KEYWORDS)]),
+])
+
+def _priority(field, table):
+    return [(_LABEL_BITS[(field, label)], label) for label, _ in table]
+
+_TOPIC_BITS = _priority("topic", _TOPIC_KEYWORDS)
+_UTTERANCE_TYPE_BITS = _priority("utterance_type", _UTTERANCE_TYPE_KEYWORDS)
+_EMOTION_BITS = _priority("emotion", _EMOTION_KEYWORDS)
+_DECISION_BIT = _LABEL_BITS[("decision", True)]
+_BLOCKER_BIT = _LABEL_BITS[("blocker", True)]
+_NEXT_ACTION_BIT = _LABEL_BITS[("next_action", True)]
+
+def _alternation(keywords):
+    return "|".join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True))
+
+# Zero-width lookaheads report a hit at every position, so overlapping keywords
+# (e.g. "i will" and "will") are all seen in a single pass over the text.
+_WORD_RE = re.compile(r"(?=\b(" + _alternation(_WORD_FLAGS) + r")\b)")
+_SUBSTRING_RE = re.compile(r"(?=(" + _alternation(_SUBSTRING_FLAGS) + r"))")
+
+def _scan(text):
+    low = text.lower()
+    flags = 0
+    for kw in _WORD_RE.findall(low):
+        flags |= _WORD_FLAGS[kw]
+    for kw in _SUBSTRING_RE.findall(low):
+        flags |= _SUBSTRING_FLAGS[kw]
+    return flags
+
+def _first_label(flags, priority, default):
+    for bit, label in priority:
+        if flags & bit:
+            return label
+    return default
+
+def _classify(text):
+    """All text-derived variables from one scan of the utterance."""
+    flags = _scan(text)
+    return {
+        "topic": _first_label(flags, _TOPIC_BITS, "general"),
+        "utterance_type": _first_label(flags, _UTTERANCE_TYPE_BITS, "statement"),
+        "emotion": _first_label(flags, _EMOTION_BITS, "neutral"),
+        "decision": bool(flags & _DECISION_BIT),
+        "blocker": bool(flags & _BLOCKER_BIT),
+        "next_action": bool(flags & _NEXT_ACTION_BIT),
+    }
+
 def detect_topic(text):
-    text = text.lower()
-    if "login" in text or "bug" in text:
-        return "bug fix update"
-    elif "qa" in text or "testing" in text:
-        return "testing schedule"
-    elif "release notes" in text:
-        return "release preparation"
-    elif "welcome" in text:
-        return "meeting kickoff"
-    else:
-        return "general"
+    return _classify(text)["topic"]
 
 def detect_utterance_type(text):
-    if re.search(r"\b(what|can|do|should|could|will)\b", text.lower()):
-        return "question"
-    elif re.search(r"\b(please|start|make sure|prepare)\b", text.lower()):
-        return "instruction"
-    elif re.search(r"\b(fixed|done|completed|progress|working on)\b", text.lower()):
-        return "status report"
-    elif re.search(r"\b(yes|i will|i’ll|sure|okay)\b", text.lower()):
-        return "commitment"
-    elif re.search(r"\b(hello|hi|welcome)\b", text.lower()):
-        return "greeting"
-    else:
-        return "statement"
+    return _classify(text)["utterance_type"]
 
 def detect_emotion(text):
-    if re.search(r"\b(great|awesome|amazing|nice)\b", text.lower()):
-        return "positive"
-    elif re.search(r"\b(sorry|problem|issue|blocked)\b", text.lower()):
-        return "negative"
-    else:
-        return "neutral"
+    return _classify(text)["emotion"]
 
 def detect_decision(text):
-    return any(keyword in text.lower() for keyword in ["yes", "i will", "we decided", "it’s fixed", "let’s go ahead"])
+    return _classify(text)["decision"]
 
 def detect_blocker(text):
-    return any(keyword in text.lower() for keyword in ["blocked", "can’t", "issue", "problem", "delay"])
+    return _classify(text)["blocker"]
 
 def detect_next_action(text):
-    return any(keyword in text.lower() for keyword in ["please", "need to", "make sure", "start", "schedule", "ask", "prepare"])
+    return _classify(text)["next_action"]
 
 def enrich_transcript(input_path):
     with open(input_path, "r", encoding="utf-8") as f:
@@ -70,12 +136,7 @@ def enrich_transcript(input_path):
             "timestamp": entry.get("timestamp", ""),
             "text": text,
             "speaker_role": classify_speaker_role(entry.get("speaker", "")),
-            "topic": detect_topic(text),
-            "utterance_type": detect_utterance_type(text),
-            "emotion": detect_emotion(text),
-            "decision": detect_decision(text),
-            "blocker": detect_blocker(text),
-            "next_action": detect_next_action(text)
+            **_classify(text),
         })
     return enriched
 
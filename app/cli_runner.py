@@ -5,8 +5,9 @@ import json
 import argparse
 import random
 from math import ceil
-from typing import List, Dict, DefaultDict, Optional
+from typing import List, Dict, DefaultDict, Optional, Set, Tuple
 from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Make 01_summarization importable (contains summarizer.py and qmsum_loader.py) ---
 HERE = os.path.dirname(os.path.abspath(__file__))
@@ -19,15 +20,16 @@ from qmsum_loader import iter_qmsum
 
 
 # ---------------- Utilities ----------------
-def split_chunks(text: str, chunk_chars: int = 12000, overlap_chars: int = 1000) -> List[str]:
+def split_chunks(text: str, chunk_chars: int = 12000, overlap_chars: int = 1000) -> List[Tuple[int, int]]:
+    """Return (start, end) offsets of overlapping windows; callers slice lazily when building prompts."""
+    n = len(text)
     if chunk_chars <= 0:
-        return [text]
+        return [(0, n)]
     out = []
-    n = len(text)
     start = 0
     while start < n:
         end = min(start + chunk_chars, n)
-        out.append(text[start:end])
+        out.append((start, end))
         if end == n:
             break
         start = max(0, end - overlap_chars)
@@ -39,32 +41,35 @@ def keyword_prefilter(transcript: str, query: str, window: int = 2) -> str:
     toks = [t for t in query.lower().split() if len(t) > 2]
     if not toks or not lines:
         return transcript
-    keep = [False] * len(lines)
+    # one C-level scan per line instead of a Python loop over tokens (same substring semantics)
+    pat = re.compile("|".join(map(re.escape, toks)), re.IGNORECASE)
+    n = len(lines)
+    keep = [False] * n
     for i, ln in enumerate(lines):
-        low = ln.lower()
-        if any(t in low for t in toks):
-            for j in range(max(0, i - window), min(len(lines), i + window + 1)):
-                keep[j] = True
+        if pat.search(ln):
+            lo, hi = max(0, i - window), min(n, i + window + 1)
+            keep[lo:hi] = [True] * (hi - lo)  # dilate the hit in one slice assignment
     kept = [l for l, k in zip(lines, keep) if k]
     if len(kept) < max(60, len(lines) // 12):
         return transcript
     return "\n".join(kept)
 
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:'[A-Za-z0-9]+)?")
+_STOP_BIGRAMS = {
+    ("you", "know"), ("kind", "of"), ("sort", "of"), ("a", "lot"),
+    ("at", "the"), ("in", "the"), ("on", "the"), ("for", "the"),
+    ("to", "the"), ("and", "the"), ("of", "the"), ("with", "the")
+}
+
 def top_bigrams(text: str, k: int = 8) -> List[str]:
     """Extract top bigrams (very cheap) to encourage reuse in phrasing (helps ROUGE-2)."""
-    toks = re.findall(r"[A-Za-z0-9]+(?:'[A-Za-z0-9]+)?", text.lower())
-    toks = [t for t in toks if len(t) > 2]
+    toks = [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 2]
     if len(toks) < 2:
         return []
-    bigs = [" ".join(pair) for pair in zip(toks, toks[1:])]
-    counts = Counter(bigs)
-    stop2 = {
-        "you know", "kind of", "sort of", "a lot",
-        "at the", "in the", "on the", "for the",
-        "to the", "and the", "of the", "with the"
-    }
-    cand = [b for b, _ in counts.most_common(60) if b not in stop2]
-    return cand[:k]
+    # count tuple pairs; only the few survivors get joined into strings
+    counts = Counter(zip(toks, toks[1:]))
+    cand = [pair for pair, _ in counts.most_common(60) if pair not in _STOP_BIGRAMS]
+    return [" ".join(pair) for pair in cand[:k]]
 
 
 # ---------------- Prompt builders ----------------
@@ -95,6 +100,42 @@ def build_query_prompt(query: str, transcript_slice: str,
         f"Transcript slice:\n{transcript_slice}"
     )
 
+def build_batched_query_prompt(query: str, transcript_slices: List[str],
+                               phrases_to_preserve: Optional[List[str]] = None,
+                               use_few_shot: bool = False,
+                               max_sentences: int = 4) -> str:
+    """Pack several map-phase slices into one prompt; answers come back as JSON indexed by slice."""
+    prefix = FEW_SHOT if use_few_shot else ""
+    keep = ""
+    if phrases_to_preserve:
+        keep = "Try to include these exact phrases if factually correct: " + "; ".join(phrases_to_preserve) + "\n\n"
+    slices = "\n\n".join(f"### Slice {i}\n{sl}" for i, sl in enumerate(transcript_slices))
+    return (
+        prefix +
+        f"Task: for EACH transcript slice below, answer ONLY the query using facts from that slice in at most {max_sentences} sentences. "
+        "Be concise but complete; include all key facts. Reuse wording from the slice when possible. No preamble.\n"
+        'Return only JSON of the form {"answers": [{"idx": <slice number>, "text": "<answer>"}]} with one entry per slice.\n\n'
+        f"{keep}"
+        f"Query: '{query}'\n\n"
+        f"Transcript slices:\n{slices}"
+    )
+
+def parse_batched_answers(raw: str, n_slices: int) -> Optional[List[str]]:
+    """Map a batched map-phase response back to per-slice answers. Returns None if malformed."""
+    start, end = raw.find("{"), raw.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        answers = json.loads(raw[start:end + 1])["answers"]
+        by_idx = {int(a["idx"]): a["text"] for a in answers}
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not all(isinstance(text, str) for text in by_idx.values()):  # e.g. "text": null must not become "None"
+        return None
+    if sorted(by_idx) != list(range(n_slices)):
+        return None
+    return [by_idx[i].strip() for i in range(n_slices)]
+
 def build_reduce_prompt(query: str, partial_summaries: List[str],
                         phrases_to_preserve: Optional[List[str]] = None,
                         max_sentences: int = 4) -> str:
@@ -110,6 +151,16 @@ def build_reduce_prompt(query: str, partial_summaries: List[str],
         f"Partial answers:\n{joined}"
     )
 
+# Queries that usually have short references (QMSum test: ~52 vs ~68 words); word-bounded so "whole" != "who"
+SHORT_ANSWER_RE = re.compile(r"\b(?:decisions?|decided|blockers?|who|when|what date)\b", re.IGNORECASE)
+SHORT_ANSWER_MAX_TOKENS = 160
+
+def max_tokens_for_query(query: str, default: int) -> int:
+    """Cap decoding for queries that typically need a short answer; never raises the default."""
+    if SHORT_ANSWER_RE.search(query):
+        return min(default, SHORT_ANSWER_MAX_TOKENS)
+    return default
+
 SYSTEM_PROMPT = (
     "You are a precise, query-focused meeting summarizer. "
     "Write concise, factual summaries in 2–4 sentences. "
@@ -118,16 +169,25 @@ SYSTEM_PROMPT = (
 )
 
 
-# ---------------- Input extractor ----------------
-def extract_transcript_from_input_text(input_text: str) -> str:
-    # qmsum_loader creates: "... 'query'\n\nTranscript:\n<full transcript>"
-    t_prefix = "Transcript:\n"
-    idx = input_text.find(t_prefix)
-    if idx == -1:
-        sep = "\n\n"
-        j = input_text.find(sep)
-        return input_text if j == -1 else input_text[j + len(sep):]
-    return input_text[idx + len(t_prefix):]
+# ---------------- Resume support ----------------
+def load_done_keys(path: str) -> Set[Tuple[str, str]]:
+    """
+    (meeting_id, query_id) pairs already written to `path` by a previous run.
+    A truncated last line left by an interrupted run is cut from the file so appends stay valid JSONL.
+    """
+    done: Set[Tuple[str, str]] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            f.truncate(complete)
+    for line in data[:complete].splitlines():
+        if line.strip():
+            row = json.loads(line)
+            done.add((row["meeting_id"], row["query_id"]))
+    return done
 
 
 # ---------------- Main runner ----------------
@@ -158,11 +218,17 @@ def main():
     ap.add_argument("--temperature", type=float, default=0.0)
     ap.add_argument("--max_tokens", type=int, default=180)
     ap.add_argument("--max_sentences", type=int, default=4, help="Max sentences in output (length control)")
+    ap.add_argument("--adaptive_max_tokens", choices=["on","off"], default="off", help="Lower max_tokens for short-answer queries")
+
+    # Throughput
+    ap.add_argument("--concurrency", type=int, default=8, help="Max concurrent map-phase API calls per query")
+    ap.add_argument("--batch_map", choices=["on","off"], default="off", help="Pack several chunks into one map-phase call")
+    ap.add_argument("--batch_map_size", type=int, default=4, help="Chunks per packed map-phase call")
+    ap.add_argument("--resume", choices=["on","off"], default="off", help="Skip queries already in --out_jsonl and append")
 
     args = ap.parse_args()
     random.seed(args.seed)
 
-    ms = MeetingSummarizer(cache_dir="cache_qmsum")
     os.makedirs(os.path.dirname(args.out_jsonl), exist_ok=True)
 
     # 1) Load all examples, group by meeting_id
@@ -187,12 +253,21 @@ def main():
 
     print(f"Queries to process: {len(run_items)} (of ~{total_items} total)")
 
+    done = load_done_keys(args.out_jsonl) if args.resume == "on" else set()
+    if done:
+        run_items = [ex for ex in run_items if (ex["meeting_id"], ex["query_id"]) not in done]
+        print(f"Resuming: {len(done)} predictions already in {args.out_jsonl}, {len(run_items)} left")
+
     # 3) Run map–reduce per query with tuned coverage + behavior knobs
     written = 0
-    with open(args.out_jsonl, "w", encoding="utf-8") as out:
+    out_mode = "a" if args.resume == "on" else "w"
+    with MeetingSummarizer(cache_dir="cache_qmsum") as ms, \
+            open(args.out_jsonl, out_mode, encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
         for ex in run_items:
             query = ex["query"]
-            full_transcript = extract_transcript_from_input_text(ex["input_text"])
+            full_transcript = ex["transcript"]
+            max_tokens = max_tokens_for_query(query, args.max_tokens) if args.adaptive_max_tokens == "on" else args.max_tokens
 
             # (a) Optional prefilter (cheap retrieval)
             text_for_chunking = keyword_prefilter(full_transcript, query, window=2) if args.prefilter == "on" else full_transcript
@@ -205,17 +280,40 @@ def main():
             if len(chunks) > args.max_chunks:
                 chunks = chunks[:args.max_chunks]
 
-            partials = []
-            for ch in chunks:
-                map_prompt = build_query_prompt(query, ch, phrases_to_preserve=phrases, use_few_shot=(args.few_shot == "on"), max_sentences=args.max_sentences)
-                part = ms.run_summarizer(
+            # Map calls are independent network round trips: run them concurrently (order preserved)
+            def summarize_chunk(span: Tuple[int, int]) -> str:
+                start, end = span
+                map_prompt = build_query_prompt(query, text_for_chunking[start:end], phrases_to_preserve=phrases, use_few_shot=(args.few_shot == "on"), max_sentences=args.max_sentences)
+                return ms.run_summarizer(
                     map_prompt,
                     model=args.model,
                     system_prompt=SYSTEM_PROMPT,
                     temperature=args.temperature,
-                    max_tokens=args.max_tokens
+                    max_tokens=max_tokens
                 ).strip()
-                partials.append(part)
+
+            # Optional packing: one call answers several chunks; falls back per chunk if the JSON is malformed
+            def summarize_batch(batch: List[Tuple[int, int]]) -> List[str]:
+                if len(batch) == 1:
+                    return [summarize_chunk(batch[0])]
+                slices = [text_for_chunking[start:end] for start, end in batch]
+                batch_prompt = build_batched_query_prompt(query, slices, phrases_to_preserve=phrases, use_few_shot=(args.few_shot == "on"), max_sentences=args.max_sentences)
+                raw = ms.run_summarizer(
+                    batch_prompt,
+                    model=args.model,
+                    system_prompt=SYSTEM_PROMPT,
+                    temperature=args.temperature,
+                    max_tokens=max_tokens * len(batch)
+                )
+                answers = parse_batched_answers(raw, len(batch))
+                return answers if answers is not None else [summarize_chunk(span) for span in batch]
+
+            if args.batch_map == "on" and len(chunks) > 1:
+                size = max(1, args.batch_map_size)
+                batches = [chunks[i:i + size] for i in range(0, len(chunks), size)]
+                partials = [part for parts in pool.map(summarize_batch, batches) for part in parts]
+            else:
+                partials = list(pool.map(summarize_chunk, chunks))
 
             if len(partials) == 1:
                 pred = partials[0]
@@ -226,7 +324,7 @@ def main():
                     model=args.model,
                     system_prompt=SYSTEM_PROMPT,
                     temperature=args.temperature,
-                    max_tokens=args.max_tokens
+                    max_tokens=max_tokens
                 ).strip()
 
             if args.revise == "on":
@@ -239,7 +337,9 @@ def main():
                 "prediction": pred,
                 "reference": ex["reference"],
             }
+            # flush per row so finished predictions survive SIGTERM/SIGKILL too (--resume picks up from here)
             out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
             written += 1
 
     print(f"Wrote {written} predictions to {args.out_jsonl}")
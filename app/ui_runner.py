@@ -1,6 +1,7 @@
 # app/ui_runner.py
-import os, sys, re
-from typing import List, Optional
+import os, sys, re, atexit
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 import gradio as gr
 
 # --- locate repo root and import code in 01_summarization ---
@@ -55,14 +56,16 @@ TASK_TEMPLATES = {
     },
 }
 
-def split_chunks(text: str, chunk_chars: int = 9000, overlap_chars: int = 800) -> List[str]:
+def split_chunks(text: str, chunk_chars: int = 9000, overlap_chars: int = 800) -> List[Tuple[int, int]]:
+    """Return (start, end) offsets of overlapping windows; slice lazily when building prompts."""
+    n = len(text)
     if chunk_chars <= 0:
-        return [text]
+        return [(0, n)]
     out = []
-    n = len(text); start = 0
+    start = 0
     while start < n:
         end = min(start + chunk_chars, n)
-        out.append(text[start:end])
+        out.append((start, end))
         if end == n: break
         start = max(0, end - overlap_chars)
     return out
@@ -86,6 +89,8 @@ def build_reduce_prompt(query: str, partials: List[str], task: str = "general")
 
 # ===== UI callback =====
 ms = MeetingSummarizer(cache_dir="cache_ui")
+atexit.register(ms.close)  # lives as long as the app; release the cache log on shutdown
+MAP_CONCURRENCY = 8  # parallel map-phase API calls per request
 
 def ui_summarize(transcript: str, query: str, task: str,
                  chunk_chars: int, overlap_chars: int,
@@ -96,14 +101,17 @@ def ui_summarize(transcript: str, query: str, task: str,
 
     chunks = split_chunks(transcript, chunk_chars=chunk_chars, overlap_chars=overlap_chars)
 
-    partials = []
-    for ch in chunks:
-        mp = build_query_prompt(query, ch, task=task)
-        part = ms.run_summarizer(
+    def summarize_chunk(span: Tuple[int, int]) -> str:
+        start, end = span
+        mp = build_query_prompt(query, transcript[start:end], task=task)
+        return ms.run_summarizer(
             mp, model="gpt-3.5-turbo", system_prompt=SYSTEM_PROMPT,
             temperature=temperature, max_tokens=max_tokens
         ).strip()
-        partials.append(part)
+
+    # a fresh pool per UI request, capped at MAP_CONCURRENCY so one long paste can't flood the API
+    with ThreadPoolExecutor(max_workers=MAP_CONCURRENCY) as pool:
+        partials = list(pool.map(summarize_chunk, chunks))
 
     if len(partials) == 1:
         final = partials[0]
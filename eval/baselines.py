@@ -23,17 +23,6 @@ from qmsum_loader import iter_qmsum
 
 # ─── helpers ───────────────────────────────────────────────────────
 
-def _extract_transcript(input_text: str) -> str:
-    """Same logic as cli_runner.extract_transcript_from_input_text."""
-    t_prefix = "Transcript:\n"
-    idx = input_text.find(t_prefix)
-    if idx == -1:
-        sep = "\n\n"
-        j = input_text.find(sep)
-        return input_text if j == -1 else input_text[j + len(sep):]
-    return input_text[idx + len(t_prefix):]
-
-
 def _sent_tokenize(text: str) -> List[str]:
     """Simple sentence splitter (avoids nltk dependency for baselines)."""
     sents = re.split(r'(?<=[.!?])\s+', text.strip())
@@ -136,8 +125,7 @@ def main():
     written = 0
     with open(args.out_jsonl, "w", encoding="utf-8") as out:
         for ex in iter_qmsum(args.qmsum_split_dir):
-            transcript = _extract_transcript(ex["input_text"])
-            pred = fn(transcript, query=ex["query"], n_sents=args.n_sents, seed=args.seed)
+            pred = fn(ex["transcript"], query=ex["query"], n_sents=args.n_sents, seed=args.seed)
             row = {
                 "meeting_id": ex["meeting_id"],
                 "query_id": ex["query_id"],
@@ -15,6 +15,7 @@ Analysis:
 
 import json, argparse, os, csv, random
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Tuple
 
 import evaluate
@@ -23,12 +24,8 @@ import evaluate
 # ─── I/O ───────────────────────────────────────────────────────────
 
 def read_jsonl(path: str) -> List[Dict]:
-    rows = []
     with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            if line.strip():
-                rows.append(json.loads(line))
-    return rows
+        return [json.loads(line) for line in f if line.strip()]
 
 
 # ─── Bootstrap CI ──────────────────────────────────────────────────
@@ -51,24 +48,28 @@ def bootstrap_ci(values: List[float], n_boot: int = 1000, ci: float = 0.95, seed
 
 # ─── Metrics ───────────────────────────────────────────────────────
 
+@lru_cache(maxsize=None)
+def _get_metric(name: str):
+    """Load an `evaluate` metric once per process; repeated scoring reuses it."""
+    return evaluate.load(name)
+
+
 def compute_rouge_per_instance(preds: List[str], refs: List[str]) -> List[Dict[str, float]]:
-    """Compute ROUGE per instance (one at a time for per-query breakdown)."""
-    rouge = evaluate.load("rouge")
-    per_instance = []
-    for p, r in zip(preds, refs):
-        scores = rouge.compute(predictions=[p], references=[r], use_stemmer=True)
-        per_instance.append({
-            "rouge1": scores["rouge1"],
-            "rouge2": scores["rouge2"],
-            "rougeL": scores["rougeL"],
-            "rougeLsum": scores.get("rougeLsum", scores["rougeL"]),
-        })
-    return per_instance
+    """Compute ROUGE per instance (for per-query breakdown) in a single batched call."""
+    if not preds:
+        return []
+    rouge = _get_metric("rouge")
+    scores = rouge.compute(predictions=preds, references=refs, use_stemmer=True, use_aggregator=False)
+    rouge_lsum = scores.get("rougeLsum", scores["rougeL"])
+    return [
+        {"rouge1": r1, "rouge2": r2, "rougeL": rl, "rougeLsum": rls}
+        for r1, r2, rl, rls in zip(scores["rouge1"], scores["rouge2"], scores["rougeL"], rouge_lsum)
+    ]
 
 
 def compute_bertscore(preds: List[str], refs: List[str]) -> List[float]:
     """BERTScore F1 per instance. Returns list of F1 scores."""
-    bertscore = evaluate.load("bertscore")
+    bertscore = _get_metric("bertscore")
     results = bertscore.compute(predictions=preds, references=refs, lang="en", model_type="microsoft/deberta-xlarge-mnli")
     return results["f1"]
 
@@ -174,7 +175,8 @@ def main():
             print(f"  {label} (n={counts}): {scores}")
 
     # ── 7. Save per-query CSV ──
-    timestamp = datetime.now().strftime("%Y%m%d%H%M")
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d%H%M")
     tag = f"_{args.tag}" if args.tag else ""
     csv_path = os.path.join(args.out_dir, f"per_query{tag}_{timestamp}.csv")
     with open(csv_path, "w", newline="", encoding="utf-8") as f:
@@ -204,7 +206,7 @@ def main():
         "source": args.preds_jsonl,
         "tag": args.tag or None,
         "instances": len(rows),
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now.isoformat(),
         "metrics": metrics_agg,
         "length": {k: round(v, 2) for k, v in lens.items()},
         "breakdown": breakdown,